@@ -1,8 +1,8 @@
 import os
 import json
-import boto3
 
 from newrelic_bedrock_observability import monitor
+from newrelic_bedrock_observability.client import get_bedrock_runtime
 
 # 모니터링 초기화
 monitor.initialization(
@@ -10,10 +10,9 @@ monitor.initialization(
     metadata={"environment": "development"},
 )
 
-# Bedrock 클라이언트 설정
-bedrock_runtime = boto3.client(
-    service_name="bedrock-runtime",
-    region_name="us-east-1",  # 사용하는 리전으로 변경
+# Bedrock 클라이언트 설정 (연결 풀을 재사용하는 캐싱 팩토리)
+bedrock_runtime = get_bedrock_runtime(
+    region="us-east-1",  # 사용하는 리전으로 변경
 )
 
 # Claude 모델 호출 예제
@@ -0,0 +1,17 @@
+"""
+패키지 공용 JSON 파싱 훅
+
+orjson이 설치되어 있으면 C 구현 파서를 사용하고 (stdlib 대비 2-3배
+빠르고 bytes를 디코딩 없이 바로 처리), 없으면 stdlib json으로 폴백한다.
+바디 파싱이 Bedrock 응답 처리 비용의 대부분을 차지하므로 모든 모듈이
+이 훅을 통해 같은 구현을 공유한다. 직렬화는 텔레메트리 SDK가 담당하므로
+여기서는 loads만 제공한다.
+"""
+import json
+
+try:
+    import orjson
+
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
@@ -1,25 +1,97 @@
 import os
 import atexit
 import logging
+import threading
+import time
+import types
 from typing import Any, Callable, Dict, Optional
 
-from newrelic_telemetry_sdk import (
-    Event,
-    EventBatch,
-    EventClient,
-    Harvester,
-    Span,
-    SpanBatch,
-    SpanClient,
-)
+# newrelic_telemetry_sdk는 임포트 비용이 커서 라이브러리를 임포트만 하고
+# 모니터링을 시작하지 않는 경우(콜드 스타트 등)를 위해 start() 시점에
+# 지연 임포트한다. 아래 이름들은 _import_sdk()가 채운다.
+Event = None
+EventBatch = None
+EventClient = None
+Harvester = None
+Span = None
+SpanBatch = None
+SpanClient = None
+_SDK_IMPORTED = False
 
 logger = logging.getLogger("newrelic_bedrock_observability")
 
+
+def _import_sdk():
+    """newrelic_telemetry_sdk를 첫 start() 호출 시점에 임포트"""
+    global _SDK_IMPORTED, Event, EventBatch, EventClient, Harvester
+    global Span, SpanBatch, SpanClient
+    if _SDK_IMPORTED:
+        return
+    import newrelic_telemetry_sdk as _sdk
+
+    Event = _sdk.Event
+    EventBatch = _sdk.EventBatch
+    EventClient = _sdk.EventClient
+    Harvester = _sdk.Harvester
+    Span = _sdk.Span
+    SpanBatch = _sdk.SpanBatch
+    SpanClient = _sdk.SpanClient
+    _SDK_IMPORTED = True
+
 # Bedrock 특화 이벤트 이름 정의
 BEDROCK_EVENT_NAME = "BedrockEvent"
 BEDROCK_SUMMARY_EVENT_NAME = "BedrockSummary"
 BEDROCK_EMBEDDING_EVENT_NAME = "BedrockEmbedding"
 
+# 드롭 발생 시 경고 로그 간격
+_DROP_LOG_INTERVAL = 100
+
+# atexit 콜백이 중복 등록되지 않도록 하는 모듈 플래그
+_ATEXIT_REGISTERED = False
+
+
+def _tune_client_pool(client, maxsize: int):
+    """
+    텔레메트리 클라이언트의 urllib3 연결 풀 크기 확장
+
+    SDK 기본 풀이 작으면 플러시가 몰릴 때 연결이 재생성되어 TLS
+    핸드셰이크 비용이 반복된다. 스트리밍처럼 플러시가 잦은 워크로드에서는
+    NR_BEDROCK_POOL_MAXSIZE를 올려 keep-alive 연결을 유지한다.
+    """
+    pool = getattr(client, "_pool", None)
+    if pool is None or getattr(pool, "maxsize", None) is None:
+        return
+    if pool.maxsize >= maxsize:
+        return
+    try:
+        new_queue = pool.QueueCls(maxsize)
+        old_queue = pool.pool
+        while True:
+            try:
+                new_queue.put_nowait(old_queue.get_nowait())
+            except Exception:
+                break
+        for _ in range(maxsize - pool.maxsize):
+            try:
+                new_queue.put_nowait(None)
+            except Exception:
+                break
+        pool.pool = new_queue
+        pool.maxsize = maxsize
+    except Exception as ex:
+        logger.debug("Failed to resize telemetry connection pool: %s", ex)
+
+
+def _batch_len(batch) -> int:
+    """텔레메트리 SDK 배치에 쌓여 있는 항목 수 반환"""
+    items = getattr(batch, "_batch", None)
+    if items is None:
+        items = getattr(batch, "_queue", ())
+    try:
+        return len(items)
+    except TypeError:
+        return 0
+
 
 class BedrockMonitoring:
     """AWS Bedrock 모니터링을 위한 클래스"""
@@ -31,6 +103,15 @@ class BedrockMonitoring:
         self.use_logger = use_logger if use_logger else False
         self.headers_by_id: dict = {}
         self.initialized = False
+        # 동시에 start()가 불려도 harvester 스레드가 중복 생성되지 않도록 보호
+        self._init_lock = threading.Lock()
+        # 플러시 사이에 배치가 무한히 자라지 않도록 버퍼 상한 적용 (drop-newest)
+        self.max_buffered = int(os.getenv("NR_BEDROCK_MAX_BUFFERED", 4096))
+        self._dropped_events = 0
+        self._dropped_spans = 0
+        self._event_defaults: Dict[str, Any] = {}
+        self._span_attr_defaults: Dict[str, Any] = {}
+        self._sdk_records_dicts = False
 
     def _set_license_key(
         self,
@@ -82,24 +163,48 @@ class BedrockMonitoring:
         parent_span_id_callback: Optional[Callable] = None,
         metadata_callback: Optional[Callable] = None,
     ):
-        """모니터링 시작"""
-        if not self.initialized:
+        """모니터링 시작 (스레드 안전, 중복 호출 무시)"""
+        with self._init_lock:
+            if self.initialized:
+                return
+            _import_sdk()
             self.application_name = application_name
             self._set_license_key(license_key)
             self._set_metadata(metadata)
             self._set_client_host(event_client_host)
             self.parent_span_id_callback = parent_span_id_callback
             self.metadata_callback = metadata_callback
+            # start() 이후 변하지 않는 기본 속성을 미리 병합 (읽기 전용 뷰로 고정)
+            self._event_defaults = types.MappingProxyType({
+                "applicationName": application_name,
+                "provider": "aws_bedrock",
+                **self.metadata,
+            })
+            self._span_attr_defaults = types.MappingProxyType({
+                "applicationName": application_name,
+                "instrumentation.provider": "nr_bedrock_observability_sdk",
+                "provider": "aws_bedrock",
+            })
             self._start()
             self.initialized = True
 
     # initialize event thread
     def _start(self):
         """이벤트 클라이언트 및 스팬 클라이언트 초기화"""
+        # Event가 dict 서브클래스라면 dict를 그대로 기록해도 직렬화 결과가 같으므로
+        # 이벤트마다 Event 생성자의 dict 복사를 건너뛸 수 있다.
+        try:
+            self._sdk_records_dicts = isinstance(Event("nr_bedrock_probe"), dict)
+        except Exception:
+            self._sdk_records_dicts = False
+
+        pool_maxsize = int(os.getenv("NR_BEDROCK_POOL_MAXSIZE", 32))
+
         self.event_client = EventClient(
             self.license_key,
             host=self.event_client_host,
         )
+        _tune_client_pool(self.event_client, pool_maxsize)
         self.event_batch = EventBatch()
 
         # Background thread that flushes the batch
@@ -108,13 +213,11 @@ class BedrockMonitoring:
         # This starts the thread
         self.event_harvester.start()
 
-        # When the process exits, run the harvester.stop() method before terminating the process
-        atexit.register(self.event_harvester.stop)
-
         self.span_client = SpanClient(
             self.license_key,
             host=self.event_client_host,
         )
+        _tune_client_pool(self.span_client, pool_maxsize)
 
         self.span_batch = SpanBatch()
 
@@ -122,18 +225,38 @@ class BedrockMonitoring:
         self.span_harvester = Harvester(self.span_client, self.span_batch)
         self.span_harvester.start()
 
-        atexit.register(self.span_harvester.stop)
+        # 프로세스 종료 시 harvester들을 정리 (중복 등록 방지)
+        global _ATEXIT_REGISTERED
+        if not _ATEXIT_REGISTERED:
+            _ATEXIT_REGISTERED = True
+            atexit.register(self.event_harvester.stop)
+            atexit.register(self.span_harvester.stop)
+            # 드롭 통계는 harvester.stop보다 먼저 실행되도록 나중에 등록
+            atexit.register(self._record_drop_stats)
 
-    def record_event(
-        self,
-        event_dict: dict,
-        table: str = BEDROCK_EVENT_NAME,
-    ):
-        """이벤트 기록"""
-        event_dict["applicationName"] = self.application_name
-        event_dict["provider"] = "aws_bedrock"
-        event_dict.update(self.metadata)
-        event = Event(table, event_dict)
+    def _record_drop_stats(self):
+        """버퍼 상한 초과로 드롭된 이벤트/스팬 수를 요약 이벤트로 기록"""
+        if self._dropped_events or self._dropped_spans:
+            event = Event(
+                BEDROCK_SUMMARY_EVENT_NAME,
+                {
+                    "applicationName": self.application_name,
+                    "provider": "aws_bedrock",
+                    "events_dropped": self._dropped_events,
+                    "spans_dropped": self._dropped_spans,
+                },
+            )
+            self.event_batch.record(event)
+
+    def _build_event(self, event_dict: dict, table: str):
+        """기본 속성과 메타데이터를 적용한 이벤트 생성"""
+        merged = {**self._event_defaults, **event_dict}
+        if self._sdk_records_dicts:
+            merged["eventType"] = table
+            merged.setdefault("timestamp", int(time.time() * 1000.0))
+            event = merged
+        else:
+            event = Event(table, merged)
         if self.metadata_callback:
             try:
                 metadata = self.metadata_callback(event)
@@ -141,13 +264,87 @@ class BedrockMonitoring:
                     event.update(metadata)
             except Exception as ex:
                 logger.warning(f"Failed to run metadata callback: {ex}")
-        self.event_batch.record(event)
+        return event
+
+    def record_event(
+        self,
+        event_dict: dict,
+        table: str = BEDROCK_EVENT_NAME,
+    ):
+        """이벤트 기록"""
+        if _batch_len(self.event_batch) >= self.max_buffered:
+            self._dropped_events += 1
+            if self._dropped_events % _DROP_LOG_INTERVAL == 1:
+                logger.warning(
+                    "Event buffer full (max_buffered=%d); dropped %d events so far",
+                    self.max_buffered,
+                    self._dropped_events,
+                )
+            return
+        self.event_batch.record(self._build_event(event_dict, table))
+
+    def record_events(
+        self,
+        event_dicts: list,
+        table: str = BEDROCK_EVENT_NAME,
+    ):
+        """
+        여러 이벤트를 한 번에 기록 (한 호출에서 나온 이벤트 묶음용)
+
+        항목은 이벤트 dict이거나 테이블을 개별 지정하는 (dict, table) 쌍일
+        수 있다. 이벤트를 모두 만들어 둔 뒤 배치 잠금을 한 번만 잡고 밀어
+        넣으므로 항목마다 record_event를 호출하는 것보다 잠금 경합이 적고,
+        같은 수확 주기에 실려 하나의 HTTP 페이로드로 압축된다.
+        """
+        if not event_dicts:
+            return
+
+        available = self.max_buffered - _batch_len(self.event_batch)
+        if available < len(event_dicts):
+            dropped = len(event_dicts) - max(available, 0)
+            # record_event과 같은 간격으로만 경고. 카운터가 배치 단위로
+            # 늘어나므로 간격 경계를 지났는지로 판정한다.
+            prev = self._dropped_events
+            self._dropped_events += dropped
+            if prev == 0 or prev // _DROP_LOG_INTERVAL != self._dropped_events // _DROP_LOG_INTERVAL:
+                logger.warning(
+                    "Event buffer full (max_buffered=%d); dropped %d events so far",
+                    self.max_buffered,
+                    self._dropped_events,
+                )
+            if available <= 0:
+                return
+            event_dicts = event_dicts[:available]
+
+        events = [
+            self._build_event(item[0], item[1])
+            if isinstance(item, tuple)
+            else self._build_event(item, table)
+            for item in event_dicts
+        ]
+
+        lock = getattr(self.event_batch, "_lock", None)
+        items = getattr(self.event_batch, "_batch", None)
+        if lock is not None and items is not None:
+            with lock:
+                items.extend(events)
+        else:
+            # SDK 내부 구조가 다르면 개별 record로 폴백
+            for event in events:
+                self.event_batch.record(event)
 
-    def record_span(self, span: Span):
+    def record_span(self, span: "Span"):
         """스팬 기록"""
-        span["attributes"]["applicationName"] = self.application_name
-        span["attributes"]["instrumentation.provider"] = "nr_bedrock_observability_sdk"
-        span["attributes"]["provider"] = "aws_bedrock"
+        if _batch_len(self.span_batch) >= self.max_buffered:
+            self._dropped_spans += 1
+            if self._dropped_spans % _DROP_LOG_INTERVAL == 1:
+                logger.warning(
+                    "Span buffer full (max_buffered=%d); dropped %d spans so far",
+                    self.max_buffered,
+                    self._dropped_spans,
+                )
+            return
+        span["attributes"].update(self._span_attr_defaults)
         span.update(self.metadata)
         self.span_batch.record(span)
 
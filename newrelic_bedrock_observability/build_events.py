@@ -1,9 +1,14 @@
+import io
 import json
 import logging
+import os
+import re
+import sys
+import threading
 import time
-import uuid
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+from newrelic_bedrock_observability._json import loads as _loads
 from newrelic_bedrock_observability.bedrock_monitoring import (
     BEDROCK_EVENT_NAME,
     BEDROCK_SUMMARY_EVENT_NAME,
@@ -13,6 +18,490 @@ from newrelic_bedrock_observability.bedrock_monitoring import (
 logger = logging.getLogger("newrelic_bedrock_observability")
 
 
+class _ThrottledLogger:
+    """
+    같은 키의 로그를 일정 주기로만 내보내는 로거 래퍼
+
+    잘못된 페이로드가 반복 유입되면 요청마다 경고가 발생하므로,
+    키별로 마지막 출력 시각을 기억해 주기 내 중복 출력을 막는다.
+    %-지연 포매팅을 사용하므로 억제된 호출은 포맷 비용도 없다.
+    """
+
+    def __init__(self, base_logger, interval: float = 60.0):
+        self._logger = base_logger
+        self._interval = interval
+        self._last_seen: Dict[str, float] = {}
+
+    def _should_log(self, key: str) -> bool:
+        now = time.monotonic()
+        last = self._last_seen.get(key)
+        if last is not None and now - last < self._interval:
+            return False
+        self._last_seen[key] = now
+        return True
+
+    def warn_once(self, key: str, msg: str, *args):
+        if self._should_log(key):
+            self._logger.warning(msg, *args)
+
+    def error_once(self, key: str, msg: str, *args):
+        if self._should_log(key):
+            self._logger.error(msg, *args)
+
+
+_tl = _ThrottledLogger(logger)
+
+# 공급자(modelId의 "." 앞 토큰)별 컴플리션 필드 테이블 (스트리밍 경로에서 사용)
+# Titan 스트림 청크는 최상위 outputText를 가진다 (results는 단발 응답 전용이라
+# 폴백으로만 유지). Cohere 스트림 청크의 텍스트는 text 키에 실린다.
+COMPLETION_KEY_BY_PROVIDER = {
+    "anthropic": ("completion", "content"),
+    "amazon": ("outputText", "results"),
+    "meta": ("generation",),
+    "cohere": ("text",),
+}
+_GENERIC_PROMPT_KEYS = ("prompt", "inputText")
+_GENERIC_COMPLETION_KEYS = ("completion", "generation", "outputText")
+
+# New Relic은 이벤트 속성을 서버 측에서 4095자로 자르므로 전송 전에 미리 자름
+MAX_ATTR_LEN = int(os.getenv("NR_BEDROCK_MAX_ATTR_LEN", 4095))
+
+
+def _clip(s: str) -> str:
+    """속성 길이 제한을 넘는 문자열을 제한 길이로 잘라 반환"""
+    return s if len(s) <= MAX_ATTR_LEN else s[:MAX_ATTR_LEN]
+
+# 요청 ID 생성용 난수 풀 (호출마다 urandom을 읽지 않도록 일괄 충전)
+_ID_POOL_SIZE = 4096
+_id_pool: bytes = b""
+_id_offset = 0
+_id_lock = threading.Lock()
+
+
+# 토큰 수 계산: tiktoken이 설치되어 있으면 실제 토큰 수, 아니면 공백 기준 추정
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_WORD_RE = re.compile(r"\S+")
+_token_encoder = None
+
+
+def _count_tokens(text: str) -> int:
+    """텍스트의 토큰 수 반환 (tiktoken 미사용 시 리스트 할당 없는 단어 수 추정)"""
+    global tiktoken, _token_encoder
+    if tiktoken is not None:
+        if _token_encoder is None:
+            try:
+                _token_encoder = tiktoken.get_encoding("cl100k_base")
+            except Exception as ex:
+                logger.warning("Failed to load tiktoken encoding: %s", ex)
+                tiktoken = None
+        if _token_encoder is not None:
+            return len(_token_encoder.encode(text))
+    return len(_WORD_RE.findall(text))
+
+
+# modelId -> (interned model_id, interned provider) 캐시. 프로세스당 모델 수는
+# 소수이므로 상한만 두고 교체 정책 없이 유지한다.
+_MODEL_CACHE: Dict[str, Tuple[str, str]] = {}
+_MODEL_CACHE_MAX = 256
+
+
+def _split_model(model_id: str) -> Tuple[str, str]:
+    """modelId와 공급자 접두어를 intern된 문자열 쌍으로 반환"""
+    cached = _MODEL_CACHE.get(model_id)
+    if cached is not None:
+        return cached
+    provider = sys.intern(model_id.split(".", 1)[0]) if "." in model_id else "unknown"
+    value = (sys.intern(model_id), provider)
+    if len(_MODEL_CACHE) < _MODEL_CACHE_MAX:
+        _MODEL_CACHE[model_id] = value
+    return value
+
+
+def _request_id() -> str:
+    """난수 풀에서 16바이트를 잘라 만든 128비트 요청 ID 반환"""
+    global _id_pool, _id_offset
+    with _id_lock:
+        if _id_offset + 16 > len(_id_pool):
+            _id_pool = os.urandom(_ID_POOL_SIZE)
+            _id_offset = 0
+        chunk = _id_pool[_id_offset:_id_offset + 16]
+        _id_offset += 16
+    return chunk.hex()
+
+
+class _SlottedEvent:
+    """
+    __slots__ 기반 이벤트 객체의 공통 베이스
+
+    이벤트당 ~10개 문자열 키를 가진 dict보다 메모리가 절반 이하이고
+    생성도 빠르다. 텔레메트리 SDK 경계에서 to_dict()로 한 번만 변환한다.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """None이 아닌 필드만 담은 dict 반환 (전송 직전 한 번 호출)"""
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if getattr(self, name) is not None
+        }
+
+
+class InvocationEvent(_SlottedEvent):
+    """InvokeModel 호출 요약 이벤트"""
+
+    __slots__ = (
+        "request_id",
+        "model_id",
+        "model_provider",
+        "response_time",
+        "prompt",
+        "prompt_tokens",
+        "completion",
+        "completion_tokens",
+        "total_tokens",
+        "aws_request_id",
+        "aws_invocation_latency",
+        "error",
+        "error_type",
+    )
+
+
+class ErrorEvent(_SlottedEvent):
+    """호출 오류 이벤트"""
+
+    __slots__ = (
+        "request_id",
+        "model_id",
+        "model_provider",
+        "error",
+        "error_type",
+        "original_error",
+        "prompt",
+    )
+
+
+class EmbeddingEvent(_SlottedEvent):
+    """임베딩 호출 이벤트"""
+
+    __slots__ = (
+        "request_id",
+        "model_id",
+        "model_provider",
+        "response_time",
+        "input_text",
+        "input_text_sample",
+        "input_text_count",
+        "input_text_tokens",
+        "embedding_dimensions",
+        "embedding_count",
+        "aws_request_id",
+        "aws_invocation_latency",
+        "error",
+        "error_type",
+        "original_error",
+    )
+
+
+def _extract_completion(body: Dict[str, Any], keys: Tuple[str, ...]) -> Optional[str]:
+    """바디에서 첫 번째로 발견되는 컴플리션 필드의 텍스트 반환"""
+    for key in keys:
+        if key in body:
+            value = body.get(key, "")
+            # Titan은 results[0].outputText에 응답 텍스트가 있음
+            if key == "results":
+                value = (value or [{}])[0].get("outputText", "")
+            return value
+    return None
+
+
+def _apply_prompt(
+    request_body: Dict[str, Any],
+    completion_data: InvocationEvent,
+    keys: Tuple[str, ...],
+) -> None:
+    """요청 바디에서 첫 번째로 발견되는 프롬프트 필드를 이벤트에 기록"""
+    for key in keys:
+        if key in request_body:
+            prompt = request_body.get(key, "")
+            completion_data.prompt = _clip(prompt)
+            completion_data.prompt_tokens = _count_tokens(prompt)
+            return
+
+
+def _apply_completion(
+    response_body: Dict[str, Any],
+    completion_data: InvocationEvent,
+    keys: Tuple[str, ...],
+) -> None:
+    """응답 바디에서 컴플리션 필드를 찾아 이벤트에 기록"""
+    completion = _extract_completion(response_body, keys)
+    if completion is not None:
+        completion_data.completion = _clip(completion)
+        completion_data.completion_tokens = _count_tokens(completion)
+
+
+def _append_messages(
+    request_body: Dict[str, Any],
+    messages: List[Dict[str, Any]],
+    common_data: Dict[str, Any],
+) -> None:
+    """요청 바디의 messages를 메시지 이벤트 목록에 추가"""
+    for i, msg in enumerate(request_body.get("messages", [])):
+        messages.append({
+            **common_data,
+            "message_index": i,
+            "role": msg.get("role", "unknown"),
+            "content": _clip(msg.get("content", "")),
+        })
+
+
+def _handle_anthropic(request_body, response_body, completion_data, messages, common_data):
+    """Claude 모델 처리"""
+    _apply_prompt(request_body, completion_data, ("prompt",))
+    if "messages" in request_body:
+        _append_messages(request_body, messages, common_data)
+    _apply_completion(response_body, completion_data, ("completion", "content"))
+
+
+def _handle_titan(request_body, response_body, completion_data, messages, common_data):
+    """Titan 모델 처리"""
+    _apply_prompt(request_body, completion_data, ("inputText",))
+    _apply_completion(response_body, completion_data, ("results",))
+
+
+def _handle_llama(request_body, response_body, completion_data, messages, common_data):
+    """Llama 모델 처리"""
+    _apply_prompt(request_body, completion_data, ("prompt",))
+    _apply_completion(response_body, completion_data, ("generation",))
+
+
+def _handle_cohere(request_body, response_body, completion_data, messages, common_data):
+    """Cohere 모델 처리"""
+    _apply_prompt(request_body, completion_data, ("prompt",))
+    generations = response_body.get("generations")
+    if generations:
+        completion = generations[0].get("text", "")
+        completion_data.completion = _clip(completion)
+        completion_data.completion_tokens = _count_tokens(completion)
+
+
+def _handle_ai21(request_body, response_body, completion_data, messages, common_data):
+    """AI21 Jurassic 모델 처리"""
+    _apply_prompt(request_body, completion_data, ("prompt",))
+    completions = response_body.get("completions")
+    if completions:
+        completion = completions[0].get("data", {}).get("text", "")
+        completion_data.completion = _clip(completion)
+        completion_data.completion_tokens = _count_tokens(completion)
+
+
+def _handle_generic(request_body, response_body, completion_data, messages, common_data):
+    """기타 모델 처리 (일반적인 필드 이름 기준)"""
+    _apply_prompt(request_body, completion_data, _GENERIC_PROMPT_KEYS)
+    if "messages" in request_body:
+        _append_messages(request_body, messages, common_data)
+    _apply_completion(response_body, completion_data, _GENERIC_COMPLETION_KEYS)
+
+
+# 공급자 접두어 -> 핸들러 (호출마다 substring 검색 대신 O(1) 룩업)
+PROVIDER_HANDLERS = {
+    "anthropic": _handle_anthropic,
+    "amazon": _handle_titan,
+    "meta": _handle_llama,
+    "cohere": _handle_cohere,
+    "ai21": _handle_ai21,
+}
+
+
+class _StreamDecoder:
+    """
+    청크 경계를 넘어 분할된 JSON 객체도 처리하는 증분 디코더
+
+    내부 버퍼에 청크를 이어 붙이며 raw_decode를 반복 호출하므로 하나의
+    JSON 객체가 여러 청크에 걸쳐 도착해도 파싱 오류 없이 복원된다.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+
+    def feed(self, data: Union[bytes, bytearray, str]) -> List[Any]:
+        """청크 데이터를 추가하고 완성된 JSON 객체 목록을 반환"""
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode("utf-8")
+        self._buffer += data
+
+        objects = []
+        while True:
+            buf = self._buffer.lstrip()
+            if not buf:
+                self._buffer = ""
+                break
+            try:
+                obj, end = self._decoder.raw_decode(buf)
+            except ValueError:
+                # 아직 불완전한 객체 - 다음 feed에서 이어서 파싱
+                self._buffer = buf
+                break
+            objects.append(obj)
+            self._buffer = buf[end:]
+        return objects
+
+
+# 응답 바디에 나타날 수 있는 관심 키의 바이트 패턴 (파싱 전 선별용)
+_RESPONSE_SCAN_KEYS = (
+    b'"completion"',
+    b'"content"',
+    b'"results"',
+    b'"generation"',
+    b'"outputText"',
+    b'"generations"',
+    b'"completions"',
+    b'"embedding"',
+    b'"embeddings"',
+)
+
+
+def _has_any_key(buf: bytes, keys: Tuple[bytes, ...]) -> bool:
+    """원시 바이트에 관심 키가 하나라도 존재하는지 확인"""
+    for key in keys:
+        if key in buf:
+            return True
+    return False
+
+
+def _count_array_len(buf: bytes, key: bytes) -> int:
+    """
+    원시 바디에서 key에 해당하는 최상위 배열의 원소 수를 계산
+
+    "key":[ ... ] 구간을 찾아 깊이 1의 쉼표만 세므로, 임베딩 벡터의
+    수천 개 float를 파이썬 객체로 구체화하지 않고 차원을 얻는다.
+
+    Args:
+        buf: 원시 바디 bytes
+        key: 따옴표를 포함한 키 (예: b'"embedding"')
+
+    Returns:
+        배열 원소 수 (키가 없거나 배열이 아니면 -1)
+    """
+    idx = buf.find(key)
+    if idx < 0:
+        return -1
+    idx = buf.find(b":", idx + len(key))
+    if idx < 0:
+        return -1
+    idx += 1
+    n = len(buf)
+    while idx < n and buf[idx] in b" \t\r\n":
+        idx += 1
+    if idx >= n or buf[idx] != 0x5B:  # '['
+        return -1
+
+    depth = 0
+    count = 0
+    has_item = False
+    in_string = False
+    escaped = False
+    for i in range(idx, n):
+        c = buf[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == 0x5C:  # '\\'
+                escaped = True
+            elif c == 0x22:  # '"'
+                in_string = False
+            continue
+        if c == 0x22:  # '"'
+            in_string = True
+            has_item = True
+        elif c == 0x5B or c == 0x7B:  # '[' '{'
+            depth += 1
+            if depth > 1:
+                has_item = True
+        elif c == 0x5D or c == 0x7D:  # ']' '}'
+            depth -= 1
+            if depth == 0:
+                return count + 1 if has_item else 0
+        elif depth == 1:
+            if c == 0x2C:  # ','
+                count += 1
+            elif c not in b" \t\r\n":
+                has_item = True
+    return -1
+
+
+def _parse_body(body: Any) -> Dict[str, Any]:
+    """
+    요청/응답 바디를 딕셔너리로 파싱
+
+    Args:
+        body: bytes/str/dict 형태의 바디
+
+    Returns:
+        파싱된 딕셔너리 (파싱 불가 시 빈 딕셔너리)
+    """
+    if body is None:
+        return {}
+    if isinstance(body, dict):
+        return body
+    if isinstance(body, (bytes, bytearray, str)):
+        try:
+            return _loads(body)
+        except Exception as ex:
+            _tl.warn_once("parse_body", "Failed to parse body: %s", ex)
+            return {}
+    return {}
+
+
+def _get_body_bytes(response: Any) -> Optional[Any]:
+    """
+    응답 바디를 한 번만 읽어 반환
+
+    바디 스트림은 한 번 읽으면 소진되므로 읽은 내용으로 BytesIO를 만들어
+    호출자가 body를 다시 읽을 수 있게 교체해 둔다. botocore 응답은 dict라
+    속성 캐싱이 불가능하므로, 반환된 내용은 호출자가 들고 있다가
+    _parse_body에 그대로 넘긴다 (바디를 두 번 읽지 않음).
+
+    Args:
+        response: Bedrock API 응답
+
+    Returns:
+        바디 내용 (없으면 None)
+    """
+    body = response.get("body") if isinstance(response, dict) else getattr(response, "body", None)
+    if body is None:
+        return None
+
+    content = body.read() if hasattr(body, "read") else body
+    if isinstance(response, dict) and isinstance(content, bytes):
+        # 호출자가 body를 다시 읽을 수 있도록 소진된 스트림 교체
+        response["body"] = io.BytesIO(content)
+    return content
+
+
+def _copy_bedrock_headers(headers: Dict[str, Any], event: _SlottedEvent) -> None:
+    """응답 헤더의 Bedrock 관련 값을 이벤트로 복사 (헤더당 .get 한 번)"""
+    rid = headers.get("x-amzn-requestid")
+    if rid is not None:
+        event.aws_request_id = rid
+    lat = headers.get("x-amzn-bedrock-invocation-latency")
+    if lat is not None:
+        event.aws_invocation_latency = lat
+
+
 def build_invocation_events(
     response: Any, 
     request: Dict[str, Any], 
@@ -33,134 +522,55 @@ def build_invocation_events(
     """
     try:
         # 요청 정보
-        model_id = request.get("modelId", "unknown")
-        model_provider = model_id.split(".")[0] if "." in model_id else "unknown"
+        model_id, model_provider = _split_model(request.get("modelId", "unknown"))
         
         # 공통 이벤트 데이터
         common_data = {
-            "request_id": str(uuid.uuid4()),
+            "request_id": _request_id(),
             "model_id": model_id,
             "model_provider": model_provider,
             "response_time": response_time if response_time is not None else 0,
         }
         
         # 요청 바디 파싱
-        request_body = {}
-        if "body" in request:
-            try:
-                if isinstance(request["body"], bytes):
-                    request_body = json.loads(request["body"].decode("utf-8"))
-                elif isinstance(request["body"], str):
-                    request_body = json.loads(request["body"])
-                else:
-                    request_body = request["body"]
-            except Exception as ex:
-                logger.warning(f"Failed to parse request body: {ex}")
-        
-        # 응답 바디 파싱
+        request_body = _parse_body(request.get("body"))
+
+        # 응답 바디 파싱 (한 번 읽은 바이트를 그대로 파싱에 사용)
+        # 관심 키가 전혀 없는 바디는 파싱 자체를 건너뜀
         response_body = {}
-        if hasattr(response, "body"):
-            try:
-                body_content = response.body.read() if hasattr(response.body, "read") else response.body
-                if isinstance(body_content, bytes):
-                    response_body = json.loads(body_content.decode("utf-8"))
-                else:
-                    response_body = body_content
-            except Exception as ex:
-                logger.warning(f"Failed to parse response body: {ex}")
-        
-        # 모델별 응답 처리
+        if response is not None:
+            body_bytes = _get_body_bytes(response)
+            if not isinstance(body_bytes, (bytes, bytearray)) or _has_any_key(body_bytes, _RESPONSE_SCAN_KEYS):
+                response_body = _parse_body(body_bytes)
+
+        # 모델별 응답 처리 (공급자 핸들러 디스패치)
         messages = []
-        completion_data = {**common_data}
-        
-        # Claude 모델 처리
-        if "anthropic" in model_id.lower():
-            if "prompt" in request_body:
-                completion_data["prompt"] = request_body.get("prompt", "")
-                completion_data["prompt_tokens"] = len(completion_data["prompt"].split())
-            
-            if "messages" in request_body:
-                for i, msg in enumerate(request_body.get("messages", [])):
-                    message_data = {
-                        **common_data,
-                        "message_index": i,
-                        "role": msg.get("role", "unknown"),
-                        "content": msg.get("content", ""),
-                    }
-                    messages.append(message_data)
-                
-            if "completion" in response_body:
-                completion_data["completion"] = response_body.get("completion", "")
-                completion_data["completion_tokens"] = len(completion_data["completion"].split())
-            
-            if "content" in response_body:
-                completion_data["completion"] = response_body.get("content", "")
-                completion_data["completion_tokens"] = len(completion_data["completion"].split())
-                
-        # Titan 모델 처리
-        elif "titan" in model_id.lower():
-            if "inputText" in request_body:
-                completion_data["prompt"] = request_body.get("inputText", "")
-                completion_data["prompt_tokens"] = len(completion_data["prompt"].split())
-            
-            if "results" in response_body:
-                completion_data["completion"] = response_body.get("results", [{}])[0].get("outputText", "")
-                completion_data["completion_tokens"] = len(completion_data["completion"].split())
-                
-        # LLama2 모델 처리
-        elif "llama" in model_id.lower():
-            if "prompt" in request_body:
-                completion_data["prompt"] = request_body.get("prompt", "")
-                completion_data["prompt_tokens"] = len(completion_data["prompt"].split())
-            
-            if "generation" in response_body:
-                completion_data["completion"] = response_body.get("generation", "")
-                completion_data["completion_tokens"] = len(completion_data["completion"].split())
-        
-        # 기타 모델 (일반적인 처리)
-        else:
-            # 일반적인 프롬프트 처리
-            if "prompt" in request_body:
-                completion_data["prompt"] = request_body.get("prompt", "")
-                completion_data["prompt_tokens"] = len(completion_data["prompt"].split())
-            elif "inputText" in request_body:
-                completion_data["prompt"] = request_body.get("inputText", "")
-                completion_data["prompt_tokens"] = len(completion_data["prompt"].split())
-            
-            # 응답 처리
-            if "completion" in response_body:
-                completion_data["completion"] = response_body.get("completion", "")
-                completion_data["completion_tokens"] = len(completion_data["completion"].split())
-            elif "generation" in response_body:
-                completion_data["completion"] = response_body.get("generation", "")
-                completion_data["completion_tokens"] = len(completion_data["completion"].split())
-            elif "outputText" in response_body:
-                completion_data["completion"] = response_body.get("outputText", "")
-                completion_data["completion_tokens"] = len(completion_data["completion"].split())
-        
+        completion_data = InvocationEvent(**common_data)
+
+        handler = PROVIDER_HANDLERS.get(model_provider, _handle_generic)
+        handler(request_body, response_body, completion_data, messages, common_data)
+
+
         # 토큰 개수 합계
-        completion_data["total_tokens"] = completion_data.get("prompt_tokens", 0) + completion_data.get("completion_tokens", 0)
-        
+        completion_data.total_tokens = (completion_data.prompt_tokens or 0) + (completion_data.completion_tokens or 0)
+
         # 응답 헤더 처리
         if response_headers:
-            if "x-amzn-requestid" in response_headers:
-                completion_data["aws_request_id"] = response_headers.get("x-amzn-requestid")
-            
-            if "x-amzn-bedrock-invocation-latency" in response_headers:
-                completion_data["aws_invocation_latency"] = response_headers.get("x-amzn-bedrock-invocation-latency")
-        
+            _copy_bedrock_headers(response_headers, completion_data)
+
         return {
             "messages": messages,
             "completion": completion_data
         }
     except Exception as ex:
-        logger.error(f"Error building invocation events: {ex}")
+        _tl.error_once("build_invocation", "Error building invocation events: %s", ex)
         return {
             "messages": [],
-            "completion": {
-                "error": str(ex),
-                "model_id": request.get("modelId", "unknown"),
-            }
+            "completion": ErrorEvent(
+                error=str(ex),
+                error_type=ex.__class__.__name__,
+                model_id=request.get("modelId", "unknown"),
+            )
         }
 
 
@@ -180,65 +590,57 @@ def build_invocation_error_events(
     """
     try:
         # 요청 정보
-        model_id = request.get("modelId", "unknown")
-        model_provider = model_id.split(".")[0] if "." in model_id else "unknown"
+        model_id, model_provider = _split_model(request.get("modelId", "unknown"))
         
         # 오류 이벤트 데이터
-        error_data = {
-            "request_id": str(uuid.uuid4()),
-            "model_id": model_id,
-            "model_provider": model_provider,
-            "error": str(error),
-            "error_type": error.__class__.__name__,
-        }
-        
+        error_data = ErrorEvent(
+            request_id=_request_id(),
+            model_id=model_id,
+            model_provider=model_provider,
+            error=str(error),
+            error_type=error.__class__.__name__,
+        )
+
         # 요청 바디 파싱
-        if "body" in request:
-            try:
-                if isinstance(request["body"], bytes):
-                    body = json.loads(request["body"].decode("utf-8"))
-                elif isinstance(request["body"], str):
-                    body = json.loads(request["body"])
-                else:
-                    body = request["body"]
-                
-                # 프롬프트 정보 추가
-                if "prompt" in body:
-                    error_data["prompt"] = body.get("prompt", "")
-                elif "inputText" in body:
-                    error_data["prompt"] = body.get("inputText", "")
-                
-                # 메시지 정보 추가
-                if "messages" in body:
-                    messages = []
-                    for i, msg in enumerate(body.get("messages", [])):
-                        message_data = {
-                            **error_data,
-                            "message_index": i,
-                            "role": msg.get("role", "unknown"),
-                            "content": msg.get("content", ""),
-                        }
-                        messages.append(message_data)
-                    return {
-                        "messages": messages,
-                        "completion": error_data
-                    }
-            except Exception as ex:
-                logger.warning(f"Failed to parse request body in error event: {ex}")
-        
+        body = _parse_body(request.get("body"))
+
+        # 프롬프트 정보 추가
+        if "prompt" in body:
+            error_data.prompt = _clip(body.get("prompt", ""))
+        elif "inputText" in body:
+            error_data.prompt = _clip(body.get("inputText", ""))
+
+        # 메시지 정보 추가
+        if "messages" in body:
+            messages = []
+            base = error_data.to_dict()
+            for i, msg in enumerate(body.get("messages", [])):
+                message_data = {
+                    **base,
+                    "message_index": i,
+                    "role": msg.get("role", "unknown"),
+                    "content": _clip(msg.get("content", "")),
+                }
+                messages.append(message_data)
+            return {
+                "messages": messages,
+                "completion": error_data
+            }
+
+
         return {
             "messages": [],
             "completion": error_data
         }
     except Exception as ex:
-        logger.error(f"Error building error events: {ex}")
+        _tl.error_once("build_invocation_error", "Error building error events: %s", ex)
         return {
             "messages": [],
-            "completion": {
-                "error": str(ex),
-                "original_error": str(error),
-                "model_id": request.get("modelId", "unknown"),
-            }
+            "completion": ErrorEvent(
+                error=str(ex),
+                original_error=str(error),
+                model_id=request.get("modelId", "unknown"),
+            )
         }
 
 
@@ -247,7 +649,7 @@ def build_embedding_event(
     request: Dict[str, Any], 
     response_headers: Optional[Dict[str, Any]] = None, 
     response_time: Optional[float] = None
-) -> Dict[str, Any]:
+) -> "EmbeddingEvent":
     """
     Bedrock 임베딩 API 응답으로부터 이벤트 생성
     
@@ -262,85 +664,71 @@ def build_embedding_event(
     """
     try:
         # 요청 정보
-        model_id = request.get("modelId", "unknown")
-        model_provider = model_id.split(".")[0] if "." in model_id else "unknown"
+        model_id, model_provider = _split_model(request.get("modelId", "unknown"))
         
         # 공통 이벤트 데이터
-        embedding_data = {
-            "request_id": str(uuid.uuid4()),
-            "model_id": model_id,
-            "model_provider": model_provider,
-            "response_time": response_time if response_time is not None else 0,
-        }
-        
+        embedding_data = EmbeddingEvent(
+            request_id=_request_id(),
+            model_id=model_id,
+            model_provider=model_provider,
+            response_time=response_time if response_time is not None else 0,
+        )
+
         # 요청 바디 파싱
-        request_body = {}
-        if "body" in request:
-            try:
-                if isinstance(request["body"], bytes):
-                    request_body = json.loads(request["body"].decode("utf-8"))
-                elif isinstance(request["body"], str):
-                    request_body = json.loads(request["body"])
-                else:
-                    request_body = request["body"]
-            except Exception as ex:
-                logger.warning(f"Failed to parse request body: {ex}")
-        
-        # 응답 바디 파싱
-        response_body = {}
-        if hasattr(response, "body"):
-            try:
-                body_content = response.body.read() if hasattr(response.body, "read") else response.body
-                if isinstance(body_content, bytes):
-                    response_body = json.loads(body_content.decode("utf-8"))
-                else:
-                    response_body = body_content
-            except Exception as ex:
-                logger.warning(f"Failed to parse response body: {ex}")
-        
+        request_body = _parse_body(request.get("body"))
+
         # 입력 텍스트 처리
         if "inputText" in request_body:
-            embedding_data["input_text"] = request_body.get("inputText", "")
-            embedding_data["input_text_tokens"] = len(embedding_data["input_text"].split())
+            input_text = request_body.get("inputText", "")
+            embedding_data.input_text = _clip(input_text)
+            embedding_data.input_text_tokens = _count_tokens(input_text)
         elif "texts" in request_body:
             # 여러 텍스트 처리
             texts = request_body.get("texts", [])
-            embedding_data["input_text_count"] = len(texts)
+            embedding_data.input_text_count = len(texts)
             if texts:
-                embedding_data["input_text"] = str(texts)
-                embedding_data["input_text_tokens"] = sum(len(text.split()) for text in texts)
-        
+                # 전체 리스트를 문자열화하지 않고 첫 텍스트 샘플만 기록
+                embedding_data.input_text_sample = _clip(texts[0])
+                embedding_data.input_text_tokens = sum(_count_tokens(text) for text in texts)
+
         # 임베딩 차원 정보
-        if "embedding" in response_body:
-            embedding = response_body.get("embedding", [])
-            embedding_data["embedding_dimensions"] = len(embedding)
-        elif "embeddings" in response_body:
-            embeddings = response_body.get("embeddings", [])
-            if embeddings:
-                embedding_data["embedding_count"] = len(embeddings)
-                embedding_data["embedding_dimensions"] = len(embeddings[0]) if embeddings[0] else 0
-        
+        # 단수 embedding 응답은 원시 바이트에서 쉼표만 세어 차원을 얻고
+        # 전체 JSON 파싱(수천 개 float 구체화)을 건너뛴다.
+        body_bytes = _get_body_bytes(response) if response is not None else None
+        dims = -1
+        if isinstance(body_bytes, (bytes, bytearray)) and b'"embeddings"' not in body_bytes:
+            dims = _count_array_len(bytes(body_bytes), b'"embedding"')
+        if dims >= 0:
+            embedding_data.embedding_dimensions = dims
+        else:
+            response_body = _parse_body(body_bytes)
+            if "embedding" in response_body:
+                embedding = response_body.get("embedding", [])
+                embedding_data.embedding_dimensions = len(embedding)
+            elif "embeddings" in response_body:
+                embeddings = response_body.get("embeddings", [])
+                if embeddings:
+                    embedding_data.embedding_count = len(embeddings)
+                    embedding_data.embedding_dimensions = len(embeddings[0]) if embeddings[0] else 0
+
         # 응답 헤더 처리
         if response_headers:
-            if "x-amzn-requestid" in response_headers:
-                embedding_data["aws_request_id"] = response_headers.get("x-amzn-requestid")
-            
-            if "x-amzn-bedrock-invocation-latency" in response_headers:
-                embedding_data["aws_invocation_latency"] = response_headers.get("x-amzn-bedrock-invocation-latency")
-        
+            _copy_bedrock_headers(response_headers, embedding_data)
+
         return embedding_data
     except Exception as ex:
-        logger.error(f"Error building embedding event: {ex}")
-        return {
-            "error": str(ex),
-            "model_id": request.get("modelId", "unknown"),
-        }
+        _tl.error_once("build_embedding", "Error building embedding event: %s", ex)
+        return EmbeddingEvent(
+            error=str(ex),
+            error_type=ex.__class__.__name__,
+            model_id=request.get("modelId", "unknown"),
+        )
 
 
 def build_embedding_error_event(
     request: Dict[str, Any], 
     error: Exception
-) -> Dict[str, Any]:
+) -> "EmbeddingEvent":
     """
     Bedrock 임베딩 API 호출 오류에 대한 이벤트 생성
     
@@ -353,47 +741,40 @@ def build_embedding_error_event(
     """
     try:
         # 요청 정보
-        model_id = request.get("modelId", "unknown")
-        model_provider = model_id.split(".")[0] if "." in model_id else "unknown"
+        model_id, model_provider = _split_model(request.get("modelId", "unknown"))
         
         # 오류 이벤트 데이터
-        error_data = {
-            "request_id": str(uuid.uuid4()),
-            "model_id": model_id,
-            "model_provider": model_provider,
-            "error": str(error),
-            "error_type": error.__class__.__name__,
-        }
-        
+        error_data = EmbeddingEvent(
+            request_id=_request_id(),
+            model_id=model_id,
+            model_provider=model_provider,
+            error=str(error),
+            error_type=error.__class__.__name__,
+        )
+
         # 요청 바디 파싱
-        if "body" in request:
-            try:
-                if isinstance(request["body"], bytes):
-                    body = json.loads(request["body"].decode("utf-8"))
-                elif isinstance(request["body"], str):
-                    body = json.loads(request["body"])
-                else:
-                    body = request["body"]
-                
-                # 입력 텍스트 처리
-                if "inputText" in body:
-                    error_data["input_text"] = body.get("inputText", "")
-                    error_data["input_text_tokens"] = len(error_data["input_text"].split())
-                elif "texts" in body:
-                    # 여러 텍스트 처리
-                    texts = body.get("texts", [])
-                    error_data["input_text_count"] = len(texts)
-                    if texts:
-                        error_data["input_text"] = str(texts)
-                        error_data["input_text_tokens"] = sum(len(text.split()) for text in texts)
-            except Exception as ex:
-                logger.warning(f"Failed to parse request body in error event: {ex}")
-        
+        body = _parse_body(request.get("body"))
+
+        # 입력 텍스트 처리
+        if "inputText" in body:
+            input_text = body.get("inputText", "")
+            error_data.input_text = _clip(input_text)
+            error_data.input_text_tokens = _count_tokens(input_text)
+        elif "texts" in body:
+            # 여러 텍스트 처리
+            texts = body.get("texts", [])
+            error_data.input_text_count = len(texts)
+            if texts:
+                # 전체 리스트를 문자열화하지 않고 첫 텍스트 샘플만 기록
+                error_data.input_text_sample = _clip(texts[0])
+                error_data.input_text_tokens = sum(_count_tokens(text) for text in texts)
+
+
         return error_data
     except Exception as ex:
-        logger.error(f"Error building embedding error event: {ex}")
-        return {
-            "error": str(ex),
-            "original_error": str(error),
-            "model_id": request.get("modelId", "unknown"),
-        } 
\ No newline at end of file
+        _tl.error_once("build_embedding_error", "Error building embedding error event: %s", ex)
+        return EmbeddingEvent(
+            error=str(ex),
+            original_error=str(error),
+            model_id=request.get("modelId", "unknown"),
+        )
\ No newline at end of file
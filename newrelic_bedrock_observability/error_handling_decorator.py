@@ -3,13 +3,36 @@ import logging
 
 logger = logging.getLogger("newrelic_bedrock_observability")
 
+# 폴백으로 첫 번째 위치 인자(원본 응답)를 돌려주라는 표식
+_SELF = object()
 
-def handle_errors(func):
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        try:
-            return func(*args, **kwargs)
-        except Exception as ex:
-            logger.error(f"Error in {func.__name__}: {ex}")
-            return args[0] if len(args) > 0 else None
-    return wrapper 
\ No newline at end of file
+
+def handle_errors(*exc_types, fallback=_SELF):
+    """
+    지정한 예외만 잡아 로깅하고 폴백 값을 돌려주는 데코레이터 팩토리
+
+    예외 타입을 지정하지 않으면 Exception을 잡는다. fallback 기본값은
+    첫 번째 위치 인자로, 패치된 핸들러에서는 원본 응답에 해당한다.
+
+    사용 예:
+        @handle_errors()
+        def handler(response, ...):
+            ...
+    """
+    if not exc_types:
+        exc_types = (Exception,)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except exc_types as ex:
+                # 지연 포매팅: 로거가 꺼져 있으면 문자열 생성 비용이 없음
+                logger.error("Error in %s: %s", func.__name__, ex)
+                if fallback is _SELF:
+                    return args[0] if args else None
+                return fallback
+        return wrapper
+
+    return decorator
@@ -2,7 +2,8 @@ import logging
 from typing import Any, Callable, Dict, Optional
 
 from newrelic_bedrock_observability.bedrock_monitoring import bedrock_monitor
-from newrelic_bedrock_observability.patcher import perform_patch
+
+__all__ = ["initialization"]
 
 logger = logging.getLogger("newrelic_bedrock_observability")
 
@@ -29,6 +30,9 @@ def initialization(
     Returns:
         모니터 객체
     """
+    # 패처는 boto3/botocore까지 끌어오므로 초기화 시점까지 임포트를 미룬다
+    from newrelic_bedrock_observability.patcher import perform_patch
+
     bedrock_monitor.start(
         application_name,
         license_key,
@@ -1,15 +1,17 @@
+import asyncio
+import atexit
 import inspect
 import logging
-import sys
-import time
-import uuid
-from argparse import ArgumentError
-from typing import Any, Dict, Optional
+import os
+import queue
+import threading
+import weakref
+from typing import TYPE_CHECKING, Optional
 
 import boto3
-import botocore
 
-from newrelic_telemetry_sdk import Span
+if TYPE_CHECKING:
+    from newrelic_telemetry_sdk import Span
 
 from newrelic_bedrock_observability.bedrock_monitoring import (
     BEDROCK_EVENT_NAME,
@@ -17,6 +19,7 @@ from newrelic_bedrock_observability.bedrock_monitoring import (
     BEDROCK_EMBEDDING_EVENT_NAME,
     bedrock_monitor,
 )
+from newrelic_bedrock_observability import build_events as _be
 from newrelic_bedrock_observability.build_events import (
     build_invocation_events,
     build_invocation_error_events,
@@ -27,28 +30,134 @@ from newrelic_bedrock_observability.error_handling_decorator import handle_error
 
 logger = logging.getLogger("newrelic_bedrock_observability")
 
+# 호출마다의 속성 조회를 줄이기 위해 모듈 수준에 바인딩
+# perf_counter는 단조 증가 클록이라 구간 측정에 wall clock보다 빠르고 정확함
+from time import perf_counter as _perf
+
+_create_span = bedrock_monitor.create_span
+
+# 모니터링 전체 토글 - False면 패치된 메소드가 원본을 그대로 호출
+_ENABLED = True
+
+# 이벤트/스팬 기록을 응답 경로에서 분리하는 백그라운드 큐 (가득 차면 드롭)
+_EVENT_QUEUE_MAX = int(os.getenv("NR_BEDROCK_EVENT_QUEUE_MAX", 10_000))
+_QUEUE_DROP_LOG_INTERVAL = 100
+# 프로세스 종료 시 큐를 비우기 위해 기다리는 최대 시간(초)
+_QUEUE_DRAIN_TIMEOUT = float(os.getenv("NR_BEDROCK_QUEUE_DRAIN_TIMEOUT", 5.0))
+_event_q: "queue.Queue" = queue.Queue(maxsize=_EVENT_QUEUE_MAX)
+_queue_dropped = 0
+_worker_started = False
+_worker_lock = threading.Lock()
+
+
+def _drain_worker():
+    """큐에 쌓인 기록 작업을 순차 처리하는 데몬 워커"""
+    while True:
+        kind, payload, table = _event_q.get()
+        try:
+            if kind == "span":
+                bedrock_monitor.record_span(payload)
+            elif kind == "events":
+                bedrock_monitor.record_events(payload)
+            else:
+                bedrock_monitor.record_event(payload, table)
+        except Exception as ex:
+            logger.debug("Failed to record telemetry item: %s", ex)
+        finally:
+            _event_q.task_done()
+
+
+def _drain_queue_at_exit():
+    """
+    프로세스 종료 시 큐에 남은 기록 작업이 처리될 때까지 제한 시간 대기
+
+    워커는 데몬 스레드라 인터프리터와 함께 사라지고, harvester들의
+    atexit stop은 배치만 플러시하므로 큐에 남은 항목은 그냥 버려진다.
+    이 훅은 harvester stop보다 나중에 등록되어 LIFO 순서상 먼저 실행되고,
+    짧게 살다 끝나는 CLI/Lambda 프로세스의 마지막 이벤트가 배치에 실린 뒤
+    플러시되게 한다. (타임아웃 있는 join과 동일한 대기)
+    """
+    with _event_q.all_tasks_done:
+        if _event_q.unfinished_tasks:
+            _event_q.all_tasks_done.wait(_QUEUE_DRAIN_TIMEOUT)
+
+
+def _ensure_worker():
+    """기록 워커 스레드를 한 번만 기동 (perform_patch 시점에 지연 시작)"""
+    global _worker_started
+    if _worker_started:
+        return
+    with _worker_lock:
+        if not _worker_started:
+            worker = threading.Thread(
+                target=_drain_worker, name="nr-bedrock-recorder", daemon=True
+            )
+            worker.start()
+            atexit.register(_drain_queue_at_exit)
+            _worker_started = True
+
+
+def _enqueue(kind, payload, table=None):
+    """
+    기록 작업을 큐에 추가
+
+    호출자 스레드에서는 put_nowait만 수행하므로 메시지 수에 비례하던
+    응답 경로의 기록 지연이 사라진다. 큐가 가득 차면 드롭하고 주기적으로
+    경고를 남긴다 (드롭 수는 _queue_dropped에 누적).
+    """
+    global _queue_dropped
+    try:
+        _event_q.put_nowait((kind, payload, table))
+    except queue.Full:
+        _queue_dropped += 1
+        if _queue_dropped % _QUEUE_DROP_LOG_INTERVAL == 1:
+            logger.warning(
+                "Telemetry queue full (max=%d); dropped %d items so far",
+                _EVENT_QUEUE_MAX,
+                _queue_dropped,
+            )
+
+
+def set_enabled(enabled: bool):
+    """
+    Bedrock 모니터링 활성화 여부 설정
+
+    False로 설정하면 패치된 메소드가 스팬 생성/타이밍/이벤트 처리를 모두
+    건너뛰고 원본 함수만 호출하므로 래퍼 오버헤드가 거의 0이 된다.
+
+    Args:
+        enabled: 모니터링 활성화 여부
+    """
+    global _ENABLED
+    _ENABLED = bool(enabled)
+
+
+# 이미 래핑된 함수 추적. botocore 클라이언트 메소드는 동적으로 생성된
+# bound method라 속성 기록이 유실될 수 있으므로 래퍼 자체를 WeakSet에
+# 등록해 재패치 시 래퍼가 중첩되지 않게 한다.
+_PATCHED = weakref.WeakSet()
+
 
 def _patched_call(original_fn, patched_fn):
     """
     함수를 패치하여 모니터링 기능 추가
-    
+
     Args:
         original_fn: 원본 함수
         patched_fn: 패치할 함수
-    
+
     Returns:
         패치된 함수
     """
-    if hasattr(original_fn, "is_patched_by_monitor"):
+    if original_fn in _PATCHED:
         return original_fn
 
     def _inner_patch(*args, **kwargs):
-        try:
-            return patched_fn(original_fn, *args, **kwargs)
-        except Exception as ex:
-            raise ex
+        if not _ENABLED:
+            return original_fn(*args, **kwargs)
+        return patched_fn(original_fn, *args, **kwargs)
 
-    _inner_patch.is_patched_by_monitor = True
+    _PATCHED.add(_inner_patch)
 
     return _inner_patch
 
@@ -56,391 +165,542 @@ def _patched_call(original_fn, patched_fn):
 def _patched_call_async(original_fn, patched_fn):
     """
     비동기 함수를 패치하여 모니터링 기능 추가
-    
+
     Args:
         original_fn: 원본 비동기 함수
         patched_fn: 패치할 비동기 함수
-    
+
     Returns:
         패치된 비동기 함수
     """
-    if hasattr(original_fn, "is_patched_by_monitor"):
+    if original_fn in _PATCHED:
         return original_fn
 
     async def _inner_patch(*args, **kwargs):
-        try:
-            return await patched_fn(original_fn, *args, **kwargs)
-        except Exception as ex:
-            raise ex
+        if not _ENABLED:
+            return await original_fn(*args, **kwargs)
+        return await patched_fn(original_fn, *args, **kwargs)
 
-    _inner_patch.is_patched_by_monitor = True
+    _PATCHED.add(_inner_patch)
 
     return _inner_patch
 
 
-def patcher_invoke_model(original_fn, *args, **kwargs):
+@handle_errors()
+def handle_invoke_model(
+    response, request, error, response_time, span: Optional["Span"] = None,
+    # 밑줄 파라미터는 LOAD_GLOBAL을 LOAD_FAST로 바꾸는 기본값 바인딩 (호출자 사용 금지)
+    _build=build_invocation_events,
+    _build_err=build_invocation_error_events,
+    _enq=_enqueue,
+    _name=BEDROCK_EVENT_NAME,
+    _sname=BEDROCK_SUMMARY_EVENT_NAME,
+):
     """
-    Bedrock InvokeModel 함수 패치
-    
+    Bedrock InvokeModel/InvokeModelWithResponseStream 응답 처리
+
     Args:
-        original_fn: 원본 InvokeModel 함수
-        args: 위치 인자
-        kwargs: 키워드 인자
-    
+        response: API 응답
+        request: API 요청 파라미터
+        error: 발생한 예외 (없으면 None)
+        response_time: 응답 시간
+        span: Span 객체
+
     Returns:
-        API 호출 결과
+        원본 응답
     """
-    logger.debug(
-        f"Running the original function: '{original_fn.__qualname__}'. args:{args}; kwargs: {kwargs}"
-    )
+    events = None
 
-    result, time_delta = None, None
-    span = bedrock_monitor.create_span()
-    try:
-        timestamp = time.time()
-        result = original_fn(*args, **kwargs)
-        time_delta = time.time() - timestamp
-    except Exception as ex:
-        span.finish()
-        handle_invoke_model(result, kwargs, ex, time_delta, span)
-        raise ex
-    span.finish()
+    if error:
+        events = _build_err(request, error)
+    else:
+        # 응답 헤더 추출 (botocore 응답은 속성이 아니라 dict 키로 메타데이터를 가짐)
+        meta = response.get("ResponseMetadata") if isinstance(response, dict) else None
+        response_headers = meta.get("HTTPHeaders", {}) if meta else {}
 
-    logger.debug(f"Finished running function: '{original_fn.__qualname__}'.")
+        events = _build(
+            response, request, response_headers, response_time
+        )
 
-    return handle_invoke_model(result, kwargs, None, time_delta, span)
+    # 슬롯 이벤트 객체는 SDK 경계에서 한 번만 dict로 변환
+    completion = events["completion"]
+    if hasattr(completion, "to_dict"):
+        completion = completion.to_dict()
 
+    # completion dict는 이 함수가 소유하므로 O(n) update 복사 대신 스팬
+    # 속성으로 그대로 연결한다. 워커에 넘기기 전에 마지막 수정을 끝낸다.
+    if span:
+        completion["name"] = _sname
+        span["attributes"] = completion
+
+    # 메시지 + 요약을 한 묶음으로 기록해 배치 잠금과 SDK 호출을 1회로 줄임
+    batch = [(event, _name) for event in events["messages"]]
+    batch.append((completion, _sname))
+    _enq("events", batch)
 
-async def patcher_invoke_model_async(original_fn, *args, **kwargs):
+    if span:
+        _enq("span", span)
+
+    return response
+
+
+@handle_errors()
+def handle_create_embedding(
+    response, request, error, response_time, span: Optional["Span"] = None,
+    # 밑줄 파라미터는 LOAD_GLOBAL을 LOAD_FAST로 바꾸는 기본값 바인딩 (호출자 사용 금지)
+    _build=build_embedding_event,
+    _build_err=build_embedding_error_event,
+    _enq=_enqueue,
+    _ename=BEDROCK_EMBEDDING_EVENT_NAME,
+):
     """
-    Bedrock InvokeModel 비동기 함수 패치
-    
+    Bedrock CreateEmbedding 응답 처리
+
     Args:
-        original_fn: 원본 InvokeModel 비동기 함수
-        args: 위치 인자
-        kwargs: 키워드 인자
-    
+        response: API 응답
+        request: API 요청 파라미터
+        error: 발생한 예외 (없으면 None)
+        response_time: 응답 시간
+        span: Span 객체
+
     Returns:
-        API 호출 결과
+        원본 응답
     """
-    logger.debug(
-        f"Running the original function: '{original_fn.__qualname__}'. args:{args}; kwargs: {kwargs}"
-    )
-    result, time_delta = None, None
-    span = bedrock_monitor.create_span()
-    try:
-        timestamp = time.time()
-        result = await original_fn(*args, **kwargs)
-        time_delta = time.time() - timestamp
-    except Exception as ex:
-        span.finish()
-        handle_invoke_model(result, kwargs, ex, time_delta, span)
-        raise ex
-    span.finish()
+    event = None
 
-    logger.debug(f"Finished running function: '{original_fn.__qualname__}'.")
+    if error:
+        event = _build_err(request, error)
+    else:
+        # 응답 헤더 추출 (botocore 응답은 속성이 아니라 dict 키로 메타데이터를 가짐)
+        meta = response.get("ResponseMetadata") if isinstance(response, dict) else None
+        response_headers = meta.get("HTTPHeaders", {}) if meta else {}
 
-    return handle_invoke_model(result, kwargs, None, time_delta, span)
+        event = _build(
+            response, request, response_headers, response_time
+        )
 
+    # 슬롯 이벤트 객체는 SDK 경계에서 한 번만 dict로 변환
+    if hasattr(event, "to_dict"):
+        event = event.to_dict()
 
-def patcher_invoke_model_with_response_stream(original_fn, *args, **kwargs):
+    # event dict는 이 함수가 소유하므로 O(n) update 복사 대신 스팬 속성으로
+    # 그대로 연결한다. 워커에 넘기기 전에 마지막 수정을 끝낸다.
+    if span:
+        event["name"] = _ename
+        span["attributes"] = event
+
+    _enq("event", event, _ename)
+
+    if span:
+        _enq("span", span)
+
+    return response
+
+
+def _make_patcher(handler):
     """
-    Bedrock InvokeModelWithResponseStream 함수 패치
-    
+    동기 Bedrock 메소드용 패처 생성
+
+    여섯 개의 patcher_* 함수가 핸들러만 다르고 동일했으므로 클로저
+    팩토리로 통합한다. 바이트코드가 줄고 3.11+의 특수화 인터프리터가
+    여섯 개의 식은 콜사이트 대신 하나의 핫 콜사이트만 데우면 된다.
+
     Args:
-        original_fn: 원본 InvokeModelWithResponseStream 함수
-        args: 위치 인자
-        kwargs: 키워드 인자
-    
+        handler: 결과/오류를 처리할 핸들러 함수
+
     Returns:
-        API 호출 결과
+        패처 함수
     """
-    logger.debug(
-        f"Running the original function: '{original_fn.__qualname__}'. args:{args}; kwargs: {kwargs}"
-    )
+    def patcher(original_fn, *args, **kwargs):
+        logger.debug(
+            "Running the original function: '%s'. args:%s; kwargs: %s",
+            original_fn.__qualname__, args, kwargs,
+        )
 
-    result, time_delta = None, None
-    span = bedrock_monitor.create_span()
-    try:
-        timestamp = time.time()
-        # 스트리밍 응답은 다른 방식으로 처리해야 할 수 있음
-        result = original_fn(*args, **kwargs)
-        time_delta = time.time() - timestamp
-    except Exception as ex:
-        span.finish()
-        handle_invoke_model(result, kwargs, ex, time_delta, span)
-        raise ex
-    span.finish()
+        result, time_delta = None, None
+        # 모니터가 시작되지 않았으면 스팬은 기록될 수 없으므로 할당 자체를 생략
+        span = _create_span() if bedrock_monitor.initialized else None
+        try:
+            t0 = _perf()
+            result = original_fn(*args, **kwargs)
+            time_delta = _perf() - t0
+        except Exception as ex:
+            if span:
+                span.finish()
+            handler(result, kwargs, ex, time_delta, span)
+            raise ex
+        if span:
+            span.finish()
 
-    logger.debug(f"Finished running function: '{original_fn.__qualname__}'.")
+        logger.debug("Finished running function: '%s'.", original_fn.__qualname__)
 
-    # 스트리밍 응답 처리
-    return handle_invoke_model(result, kwargs, None, time_delta, span)
+        return handler(result, kwargs, None, time_delta, span)
 
+    return patcher
 
-async def patcher_invoke_model_with_response_stream_async(original_fn, *args, **kwargs):
+
+def _make_patcher_async(handler):
     """
-    Bedrock InvokeModelWithResponseStream 비동기 함수 패치
-    
+    비동기 Bedrock 메소드용 패처 생성 (_make_patcher의 코루틴 버전)
+
     Args:
-        original_fn: 원본 InvokeModelWithResponseStream 비동기 함수
-        args: 위치 인자
-        kwargs: 키워드 인자
-    
+        handler: 결과/오류를 처리할 핸들러 함수
+
     Returns:
-        API 호출 결과
+        비동기 패처 함수
     """
-    logger.debug(
-        f"Running the original function: '{original_fn.__qualname__}'. args:{args}; kwargs: {kwargs}"
-    )
-    result, time_delta = None, None
-    span = bedrock_monitor.create_span()
-    try:
-        timestamp = time.time()
-        result = await original_fn(*args, **kwargs)
-        time_delta = time.time() - timestamp
-    except Exception as ex:
-        span.finish()
-        handle_invoke_model(result, kwargs, ex, time_delta, span)
-        raise ex
-    span.finish()
+    async def patcher(original_fn, *args, **kwargs):
+        logger.debug(
+            "Running the original function: '%s'. args:%s; kwargs: %s",
+            original_fn.__qualname__, args, kwargs,
+        )
 
-    logger.debug(f"Finished running function: '{original_fn.__qualname__}'.")
+        result, time_delta = None, None
+        # 모니터가 시작되지 않았으면 스팬은 기록될 수 없으므로 할당 자체를 생략
+        span = _create_span() if bedrock_monitor.initialized else None
+        # 루프가 스케줄링에 쓰는 단조 클록을 그대로 읽어 clock_gettime 왕복을 줄임
+        clock = asyncio.get_running_loop().time
+        try:
+            t0 = clock()
+            result = await original_fn(*args, **kwargs)
+            time_delta = clock() - t0
+        except Exception as ex:
+            if span:
+                span.finish()
+            handler(result, kwargs, ex, time_delta, span)
+            raise ex
+        if span:
+            span.finish()
 
-    return handle_invoke_model(result, kwargs, None, time_delta, span)
+        logger.debug("Finished running function: '%s'.", original_fn.__qualname__)
 
+        return handler(result, kwargs, None, time_delta, span)
 
-@handle_errors
-def handle_invoke_model(
-    response, request, error, response_time, span: Optional[Span] = None
-):
+    return patcher
+
+
+# 기존 공개 이름 유지
+patcher_invoke_model = _make_patcher(handle_invoke_model)
+patcher_create_embedding = _make_patcher(handle_create_embedding)
+patcher_invoke_model_async = _make_patcher_async(handle_invoke_model)
+patcher_create_embedding_async = _make_patcher_async(handle_create_embedding)
+
+
+# 스트리밍 델타 이벤트를 몇 개씩 묶어 기록할지 (청크마다 큐 항목을 만들지 않음)
+_STREAM_FLUSH_WINDOW = int(os.getenv("NR_BEDROCK_STREAM_FLUSH_WINDOW", 32))
+
+
+class _StreamInstrumenter:
     """
-    Bedrock InvokeModel/InvokeModelWithResponseStream 응답 처리
-    
-    Args:
-        response: API 응답
-        request: API 요청 파라미터
-        error: 발생한 예외 (없으면 None)
-        response_time: 응답 시간
-        span: Span 객체
-    
-    Returns:
-        원본 응답
+    응답 스트림을 소비와 동시에 계측하는 상태 묶음
+
+    청크 바이트를 증분 디코더에 먹이며 델타 이벤트를 윈도우 단위로
+    배치 기록하고, 스트림 종료 시 첫 청크까지의 지연·청크 수·토큰 수를
+    담은 요약 이벤트 하나를 남긴다. 전체 응답을 누적하지 않는다.
     """
-    events = None
-    
-    if error:
-        events = build_invocation_error_events(request, error)
-    else:
-        # 응답 헤더 추출
-        response_headers = {}
-        if hasattr(response, "ResponseMetadata"):
-            response_headers = response.ResponseMetadata.get("HTTPHeaders", {})
-        
-        events = build_invocation_events(
-            response, request, response_headers, response_time
+
+    def __init__(self, request, span, t0, clock=_perf, response_headers=None):
+        model_id, model_provider = _be._split_model(request.get("modelId", "unknown"))
+        self.common = {
+            "request_id": _be._request_id(),
+            "model_id": model_id,
+            "model_provider": model_provider,
+        }
+        self.keys = _be.COMPLETION_KEY_BY_PROVIDER.get(
+            model_provider, _be._GENERIC_COMPLETION_KEYS
         )
+        self.decoder = _be._StreamDecoder()
+        self.span = span
+        self.t0 = t0
+        # t0와 같은 클록으로 읽어야 하므로 호출자가 쓰는 클록을 그대로 받음
+        self.clock = clock
+        self.response_headers = response_headers
+        self.batch = []
+        self.chunk_index = 0
+        self.completion_tokens = 0
+        self.first_chunk_time = None
+        # 프롬프트/메시지 이벤트는 요청 바디만으로 만들 수 있으므로 단발
+        # 경로와 동일하게 여기서 추출한다 (스트림 소비를 기다리지 않음).
+        carrier = _be.InvocationEvent()
+        try:
+            request_body = _be._parse_body(request.get("body"))
+            _be._apply_prompt(request_body, carrier, _be._GENERIC_PROMPT_KEYS)
+            if "messages" in request_body:
+                messages = []
+                _be._append_messages(request_body, messages, self.common)
+                self.batch.extend((msg, BEDROCK_EVENT_NAME) for msg in messages)
+        except Exception as ex:
+            logger.debug("Failed to extract prompt from streaming request: %s", ex)
+        self.prompt = carrier.prompt
+        self.prompt_tokens = carrier.prompt_tokens or 0
+
+    def observe(self, event):
+        """스트림 이벤트 하나를 계측 (원본 이벤트는 변경하지 않음)"""
+        if self.first_chunk_time is None:
+            self.first_chunk_time = self.clock() - self.t0
+        try:
+            chunk = event.get("chunk") if isinstance(event, dict) else None
+            data = chunk.get("bytes") if chunk else None
+            if data is None:
+                return
+            for obj in self.decoder.feed(data):
+                delta = {**self.common, "chunk_index": self.chunk_index}
+                completion = _be._extract_completion(obj, self.keys)
+                if completion is not None:
+                    delta["completion"] = _be._clip(completion)
+                    tokens = _be._count_tokens(completion)
+                    delta["completion_tokens"] = tokens
+                    self.completion_tokens += tokens
+                self.batch.append((delta, BEDROCK_EVENT_NAME))
+                self.chunk_index += 1
+            if len(self.batch) >= _STREAM_FLUSH_WINDOW:
+                _enqueue("events", self.batch)
+                self.batch = []
+        except Exception as ex:
+            logger.debug("Failed to instrument stream chunk: %s", ex)
+
+    def close(self):
+        """스트림 종료 처리: 남은 델타와 요약 이벤트 기록, 스팬 마감"""
+        summary = {
+            **self.common,
+            "response_time": self.clock() - self.t0,
+            "time_to_first_chunk": self.first_chunk_time or 0,
+            "chunk_count": self.chunk_index,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+        }
+        if self.prompt is not None:
+            summary["prompt"] = self.prompt
+            summary["prompt_tokens"] = self.prompt_tokens
+        # 단발 경로의 _copy_bedrock_headers와 같은 헤더를 요약에 기록
+        if self.response_headers:
+            rid = self.response_headers.get("x-amzn-requestid")
+            if rid is not None:
+                summary["aws_request_id"] = rid
+            lat = self.response_headers.get("x-amzn-bedrock-invocation-latency")
+            if lat is not None:
+                summary["aws_invocation_latency"] = lat
+        if self.span:
+            summary["name"] = BEDROCK_SUMMARY_EVENT_NAME
+            self.span["attributes"] = summary
+        self.batch.append((summary, BEDROCK_SUMMARY_EVENT_NAME))
+        _enqueue("events", self.batch)
+        self.batch = []
+        if self.span:
+            self.span.finish()
+            _enqueue("span", self.span)
+
+
+def _instrument_stream(stream, request, span, t0, clock=_perf, response_headers=None):
+    """원본 이벤트를 그대로 흘려보내는 패스스루 제너레이터 (동기)"""
+    inst = _StreamInstrumenter(request, span, t0, clock, response_headers)
+    try:
+        for event in stream:
+            inst.observe(event)
+            yield event
+    finally:
+        inst.close()
 
-    for event in events["messages"]:
-        bedrock_monitor.record_event(event, BEDROCK_EVENT_NAME)
-    
-    bedrock_monitor.record_event(events["completion"], BEDROCK_SUMMARY_EVENT_NAME)
-    
-    if span:
-        span["attributes"].update(events["completion"])
-        span["attributes"]["name"] = BEDROCK_SUMMARY_EVENT_NAME
-        bedrock_monitor.record_span(span)
 
-    return response
+async def _instrument_stream_async(stream, request, span, t0, clock=_perf, response_headers=None):
+    """원본 이벤트를 그대로 흘려보내는 패스스루 제너레이터 (비동기)"""
+    inst = _StreamInstrumenter(request, span, t0, clock, response_headers)
+    try:
+        async for event in stream:
+            inst.observe(event)
+            yield event
+    finally:
+        inst.close()
 
 
-def patcher_create_embedding(original_fn, *args, **kwargs):
+def patcher_invoke_model_with_response_stream(original_fn, *args, **kwargs):
     """
-    Bedrock CreateEmbedding 함수 패치
-    
+    Bedrock InvokeModelWithResponseStream 함수 패치
+
+    스트림을 끝까지 소비한 뒤 처리하는 대신 body를 패스스루 제너레이터로
+    감싸 호출자가 소비하는 동안 계측한다. 호출자 지연이 추가되지 않고
+    첫 청크까지의 시간 같은 스트리밍 고유 지표를 얻는다.
+
     Args:
-        original_fn: 원본 CreateEmbedding 함수
+        original_fn: 원본 InvokeModelWithResponseStream 함수
         args: 위치 인자
         kwargs: 키워드 인자
-    
+
     Returns:
-        API 호출 결과
+        body가 계측 제너레이터로 감싸진 API 호출 결과
     """
     logger.debug(
-        f"Running the original function: '{original_fn.__qualname__}'. args:{args}; kwargs: {kwargs}"
+        "Running the original function: '%s'. args:%s; kwargs: %s",
+        original_fn.__qualname__, args, kwargs,
     )
 
-    result, time_delta = None, None
-    span = bedrock_monitor.create_span()
+    # 모니터가 시작되지 않았으면 스팬은 기록될 수 없으므로 할당 자체를 생략
+    span = _create_span() if bedrock_monitor.initialized else None
+    t0 = _perf()
     try:
-        timestamp = time.time()
         result = original_fn(*args, **kwargs)
-        time_delta = time.time() - timestamp
     except Exception as ex:
-        span.finish()
-        handle_create_embedding(result, kwargs, ex, time_delta, span)
-        raise ex
-    span.finish()
-
-    logger.debug(f"Finished running function: '{original_fn.__qualname__}'.")
-
-    return handle_create_embedding(result, kwargs, None, time_delta, span)
+        if span:
+            span.finish()
+        handle_invoke_model(None, kwargs, ex, _perf() - t0, span)
+        raise
+
+    body = result.get("body") if isinstance(result, dict) else None
+    if body is None:
+        # 스트림이 없는 응답은 단발 호출과 동일하게 처리
+        if span:
+            span.finish()
+        return handle_invoke_model(result, kwargs, None, _perf() - t0, span)
+
+    # 응답 헤더는 바디 소비 전에 이미 있으므로 요약 이벤트용으로 전달
+    meta = result.get("ResponseMetadata")
+    response_headers = meta.get("HTTPHeaders", {}) if meta else {}
+
+    result["body"] = _instrument_stream(
+        body, kwargs, span, t0, response_headers=response_headers
+    )
+    return result
 
 
-async def patcher_create_embedding_async(original_fn, *args, **kwargs):
+async def patcher_invoke_model_with_response_stream_async(original_fn, *args, **kwargs):
     """
-    Bedrock CreateEmbedding 비동기 함수 패치
-    
+    Bedrock InvokeModelWithResponseStream 비동기 함수 패치
+
     Args:
-        original_fn: 원본 CreateEmbedding 비동기 함수
+        original_fn: 원본 InvokeModelWithResponseStream 비동기 함수
         args: 위치 인자
         kwargs: 키워드 인자
-    
+
     Returns:
-        API 호출 결과
+        body가 계측 제너레이터로 감싸진 API 호출 결과
     """
     logger.debug(
-        f"Running the original function: '{original_fn.__qualname__}'. args:{args}; kwargs: {kwargs}"
+        "Running the original function: '%s'. args:%s; kwargs: %s",
+        original_fn.__qualname__, args, kwargs,
     )
 
-    result, time_delta = None, None
-    span = bedrock_monitor.create_span()
+    # 모니터가 시작되지 않았으면 스팬은 기록될 수 없으므로 할당 자체를 생략
+    span = _create_span() if bedrock_monitor.initialized else None
+    # 루프가 스케줄링에 쓰는 단조 클록을 그대로 읽어 clock_gettime 왕복을 줄임
+    clock = asyncio.get_running_loop().time
+    t0 = clock()
     try:
-        timestamp = time.time()
         result = await original_fn(*args, **kwargs)
-        time_delta = time.time() - timestamp
     except Exception as ex:
-        span.finish()
-        handle_create_embedding(result, kwargs, ex, time_delta, span)
-        raise ex
-    span.finish()
+        if span:
+            span.finish()
+        handle_invoke_model(None, kwargs, ex, clock() - t0, span)
+        raise
+
+    body = result.get("body") if isinstance(result, dict) else None
+    if body is None:
+        if span:
+            span.finish()
+        return handle_invoke_model(result, kwargs, None, clock() - t0, span)
+
+    # 응답 헤더는 바디 소비 전에 이미 있으므로 요약 이벤트용으로 전달
+    meta = result.get("ResponseMetadata")
+    response_headers = meta.get("HTTPHeaders", {}) if meta else {}
+
+    if hasattr(body, "__aiter__"):
+        result["body"] = _instrument_stream_async(
+            body, kwargs, span, t0, clock, response_headers
+        )
+    else:
+        result["body"] = _instrument_stream(
+            body, kwargs, span, t0, clock, response_headers
+        )
+    return result
 
-    logger.debug(f"Finished running function: '{original_fn.__qualname__}'.")
 
-    return handle_create_embedding(result, kwargs, None, time_delta, span)
 
+# bedrock-runtime 클라이언트에서 패치할 (메소드 이름, 동기 패처, 비동기 패처) 테이블
+_METHODS = (
+    ("invoke_model", patcher_invoke_model, patcher_invoke_model_async),
+    (
+        "invoke_model_with_response_stream",
+        patcher_invoke_model_with_response_stream,
+        patcher_invoke_model_with_response_stream_async,
+    ),
+    ("create_embedding", patcher_create_embedding, patcher_create_embedding_async),
+)
 
-@handle_errors
-def handle_create_embedding(
-    response, request, error, response_time, span: Optional[Span] = None
-):
-    """
-    Bedrock CreateEmbedding 응답 처리
-    
-    Args:
-        response: API 응답
-        request: API 요청 파라미터
-        error: 발생한 예외 (없으면 None)
-        response_time: 응답 시간
-        span: Span 객체
-    
-    Returns:
-        원본 응답
+# 클라이언트 클래스 생성 시점에 발생하는 botocore 이벤트
+_HANDLER_EVENT = "creating-client-class.bedrock-runtime"
+_HANDLERS_REGISTERED = False
+
+
+def _install_bedrock_patches(class_attributes, base_classes=None, **kwargs):
     """
-    event = None
-    
-    if error:
-        event = build_embedding_error_event(request, error)
-    else:
-        # 응답 헤더 추출
-        response_headers = {}
-        if hasattr(response, "ResponseMetadata"):
-            response_headers = response.ResponseMetadata.get("HTTPHeaders", {})
-        
-        event = build_embedding_event(
-            response, request, response_headers, response_time
-        )
+    bedrock-runtime 클라이언트 클래스가 만들어질 때 메소드를 래핑
 
-    bedrock_monitor.record_event(event, BEDROCK_EMBEDDING_EVENT_NAME)
-    
-    if span:
-        span["attributes"].update(event)
-        span["attributes"]["name"] = BEDROCK_EMBEDDING_EVENT_NAME
-        bedrock_monitor.record_span(span)
+    creating-client-class 이벤트는 bedrock-runtime에만 발생하므로 다른
+    서비스의 클라이언트 생성은 래퍼 비용을 전혀 지불하지 않는다.
+    aiobotocore 세션도 BUILTIN_HANDLERS를 상속하므로 비동기 클라이언트
+    클래스에도 동일하게 적용된다.
+    """
+    # 같은 클래스 속성에 핸들러가 두 번 불려도 (중복 등록 등) 메소드 순회와
+    # WeakSet 조회 없이 바로 빠져나가도록 클래스 수준 센티널을 둔다.
+    if class_attributes.get("__bedrock_nr_patched__"):
+        return
 
-    return response
+    try:
+        # 동기/비동기 판정은 패치 시점에 한 번만 수행한다. 단, 생성된 API
+        # 메소드 자체로는 판정할 수 없다: botocore의 _create_api_method가
+        # 만드는 _api_call은 동기/비동기 클라이언트 모두 평범한 def이고,
+        # aiobotocore에서는 그 함수가 _make_api_call 코루틴을 "반환"할
+        # 뿐이라 iscoroutinefunction(fn)은 항상 False다. 대신 베이스
+        # 클래스의 _make_api_call이 코루틴인지로 클라이언트 모드를 읽는다.
+        is_async = False
+        if base_classes:
+            make_api_call = getattr(base_classes[0], "_make_api_call", None)
+            is_async = inspect.iscoroutinefunction(make_api_call)
+
+        for name, sync_patcher, async_patcher in _METHODS:
+            fn = class_attributes.get(name)
+            if fn is None or not callable(fn):
+                continue
+            # 동기 함수에 비동기 래퍼가 붙으면(또는 그 반대) 호출마다 응답
+            # 대신 코루틴 객체를 계측하게 되므로 여기서 래퍼와 패처를 함께
+            # 선택하고, 핫 패스에는 분기를 남기지 않는다.
+            if is_async:
+                class_attributes[name] = _patched_call_async(fn, async_patcher)
+            else:
+                class_attributes[name] = _patched_call(fn, sync_patcher)
+
+        class_attributes["__bedrock_nr_patched__"] = True
+        logger.info("AWS Bedrock 클라이언트 메소드 패치 완료")
+    except Exception as ex:
+        logger.error(f"AWS Bedrock 클라이언트 메소드 패치 실패: {ex}")
 
 
 def perform_patch():
     """
     Bedrock 클라이언트 메소드를 패치하여 모니터링 추가
+
+    boto3.client 전체를 감싸는 대신 bedrock-runtime 한정 botocore 이벤트에
+    설치 핸들러를 등록한다. 이후 생성되는 모든 세션(동기/비동기)이
+    BUILTIN_HANDLERS를 상속받아 클래스 수준에서 한 번에 패치된다.
     """
+    global _HANDLERS_REGISTERED
+
+    # 기록 워커는 패치 시점에 한 번만 기동
+    _ensure_worker()
+
+    if _HANDLERS_REGISTERED:
+        return
+
     try:
-        # AWS 서비스 클라이언트를 생성할 때 패치
-        original_client = boto3.client
-        
-        def patched_client(*args, **kwargs):
-            client = original_client(*args, **kwargs)
-            
-            # Bedrock 클라이언트인 경우에만 패치
-            if args and args[0] == "bedrock-runtime":
-                try:
-                    # InvokeModel 패치
-                    if hasattr(client, "invoke_model"):
-                        client.invoke_model = _patched_call(
-                            client.invoke_model, patcher_invoke_model
-                        )
-                    
-                    # InvokeModelWithResponseStream 패치
-                    if hasattr(client, "invoke_model_with_response_stream"):
-                        client.invoke_model_with_response_stream = _patched_call(
-                            client.invoke_model_with_response_stream, patcher_invoke_model_with_response_stream
-                        )
-                    
-                    # CreateEmbedding 패치
-                    if hasattr(client, "create_embedding"):
-                        client.create_embedding = _patched_call(
-                            client.create_embedding, patcher_create_embedding
-                        )
-                    
-                    logger.info("AWS Bedrock 클라이언트 메소드 패치 완료")
-                except Exception as ex:
-                    logger.error(f"AWS Bedrock 클라이언트 메소드 패치 실패: {ex}")
-            
-            return client
-        
-        boto3.client = patched_client
-        
-        # 비동기 클라이언트도 지원하는 경우 패치
-        try:
-            import aioboto3
-            
-            original_aioclient = aioboto3.client
-            
-            async def patched_aioclient(*args, **kwargs):
-                client = await original_aioclient(*args, **kwargs)
-                
-                # Bedrock 클라이언트인 경우에만 패치
-                if args and args[0] == "bedrock-runtime":
-                    try:
-                        # 비동기 메소드 패치
-                        if hasattr(client, "invoke_model"):
-                            client.invoke_model = _patched_call_async(
-                                client.invoke_model, patcher_invoke_model_async
-                            )
-                        
-                        if hasattr(client, "invoke_model_with_response_stream"):
-                            client.invoke_model_with_response_stream = _patched_call_async(
-                                client.invoke_model_with_response_stream, patcher_invoke_model_with_response_stream_async
-                            )
-                        
-                        if hasattr(client, "create_embedding"):
-                            client.create_embedding = _patched_call_async(
-                                client.create_embedding, patcher_create_embedding_async
-                            )
-                        
-                        logger.info("AWS Bedrock 비동기 클라이언트 메소드 패치 완료")
-                    except Exception as ex:
-                        logger.error(f"AWS Bedrock 비동기 클라이언트 메소드 패치 실패: {ex}")
-                
-                return client
-            
-            aioboto3.client = patched_aioclient
-            
-        except ImportError:
-            # aioboto3가 설치되지 않은 경우 무시
-            pass
-        
+        from botocore.handlers import BUILTIN_HANDLERS
+
+        BUILTIN_HANDLERS.append((_HANDLER_EVENT, _install_bedrock_patches))
+
+        # 이미 생성되어 있는 기본 세션에도 등록 (이후 만드는 클라이언트에 적용)
+        session = getattr(boto3, "DEFAULT_SESSION", None)
+        if session is not None:
+            session.events.register(_HANDLER_EVENT, _install_bedrock_patches)
+
+        _HANDLERS_REGISTERED = True
     except Exception as ex:
         logger.error(f"AWS Bedrock 클라이언트 패치 중 오류 발생: {ex}")
         raise 
\ No newline at end of file
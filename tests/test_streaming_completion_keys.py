@@ -0,0 +1,69 @@
+"""스트리밍 경로의 공급자별 컴플리션 키 회귀 테스트"""
+import json
+import sys
+import types
+
+# patcher는 임포트 시 boto3/botocore를 끌어오므로 미설치 환경에서는 스텁으로 대체
+for _name in ("boto3", "botocore"):
+    sys.modules.setdefault(_name, types.ModuleType(_name))
+if "botocore.handlers" not in sys.modules:
+    _handlers = types.ModuleType("botocore.handlers")
+    _handlers.BUILTIN_HANDLERS = []
+    sys.modules["botocore.handlers"] = _handlers
+
+from newrelic_bedrock_observability import patcher
+
+
+def _drain_queue():
+    """워커가 기동되지 않은 상태에서 큐에 쌓인 기록 작업을 회수"""
+    items = []
+    while not patcher._event_q.empty():
+        items.append(patcher._event_q.get_nowait())
+    return items
+
+
+def _run_stream(model_id, chunk_payloads, request_body=None):
+    """청크 페이로드 목록을 계측 스트림에 통과시키고 (델타, 요약)을 반환"""
+    chunks = [
+        {"chunk": {"bytes": json.dumps(payload).encode()}}
+        for payload in chunk_payloads
+    ]
+    request = {
+        "modelId": model_id,
+        "body": json.dumps(request_body or {"prompt": "hi"}),
+    }
+    list(patcher._instrument_stream(iter(chunks), request, None, patcher._perf()))
+
+    events = [
+        item
+        for kind, payload, _ in _drain_queue()
+        if kind == "events"
+        for item in payload
+    ]
+    deltas = [event for event, _ in events if "chunk_index" in event]
+    summary = next(event for event, table in events if table == "BedrockSummary")
+    return deltas, summary
+
+
+def test_titan_stream_chunk_records_completion():
+    # Titan 스트림 청크는 results가 아니라 최상위 outputText를 가진다
+    deltas, summary = _run_stream(
+        "amazon.titan-text-express-v1",
+        [{"outputText": "Hello"}, {"outputText": " world again"}],
+        request_body={"inputText": "hi"},
+    )
+    assert [d["completion"] for d in deltas] == ["Hello", " world again"]
+    assert summary["completion_tokens"] == 3
+    assert summary["total_tokens"] == summary["prompt_tokens"] + 3
+
+
+def test_cohere_stream_chunk_records_completion():
+    deltas, summary = _run_stream("cohere.command-text-v14", [{"text": "hey"}])
+    assert deltas[0]["completion"] == "hey"
+    assert summary["completion_tokens"] == 1
+
+
+def test_anthropic_stream_chunk_records_completion():
+    deltas, summary = _run_stream("anthropic.claude-v2", [{"completion": "ok"}])
+    assert deltas[0]["completion"] == "ok"
+    assert summary["chunk_count"] == 1